@@ -2,145 +2,177 @@
 
 import os
 import sys
+from functools import lru_cache
+from itertools import chain
 import xml.etree.ElementTree as ET
 
 INDENT = "\t"
+INDENT2 = INDENT * 2
+INDENT3 = INDENT * 3
+INDENT4 = INDENT * 4
 NEWLINE = "\n"
 OUTPUT_PATH = "SakilaDapper/Model/ModelsGenerated.cs"
 OUTPUT_MAP_PATH = "SakilaDapper/Model/MappersGenerated.cs"
 NAMESPACE = "SakilaDapper.Model"
 
+CLASS_SUMMARY_TEMPLATE = "/// <summary>" + NEWLINE + "/// {comment}" + NEWLINE + "/// </summary>"
+CLASS_OPEN_TEMPLATE = "public partial class {class_name}" + NEWLINE + "{{"
+PROPERTY_SUMMARY_TEMPLATE = (
+    INDENT + "/// <summary>" + NEWLINE
+    + INDENT + "/// {comment}" + NEWLINE
+    + INDENT + "/// </summary>"
+)
+PROPERTY_TEMPLATE = INDENT + "public {type_name} {field_name} {{ get; set; }}"
+MAPPER_ITEM_TEMPLATE = INDENT3 + '("{column_name}", nameof({class_name}.{field_name}))'
+
+# keys are checked as prefixes in this order when the base type is not an exact match
+TYPE_MAP = {
+    "tinyint": "int",
+    "smallint": "int",
+    "mediumint": "int",
+    "int": "int",
+    "bigint": "long",
+    "timestamp": "DateTime",
+    "datetime": "DateTime",
+    "varchar": "string",
+    "char": "string",
+    "tinytext": "string",
+    "mediumtext": "string",
+    "text": "string",
+    "longtext": "string",
+    "set": "string",
+    "enum": "string",
+    "geometry": "string",
+    "year": "int",
+    "date": "DateOnly",
+    "decimal": "decimal",
+    "blob": "byte[]",
+}
+UNSIGNED_TYPE_MAP = {
+    "tinyint": "uint",
+    "smallint": "uint",
+    "mediumint": "uint",
+    "int": "uint",
+    "bigint": "ulong",
+}
+
+def find_type_key(db_type: str, type_map: dict) -> str | None:
+    base = db_type.split("(", 1)[0].split(" ", 1)[0]
+    if base in type_map:
+        return base
+    return next((key for key in type_map if db_type.startswith(key)), None)
+
+@lru_cache(maxsize=None)
 def resolve_type(db_type: str) -> str:
     if db_type.startswith("tinyint(1)"):
         return "bool"
-    if any(db_type.startswith(t) for t in ["tinyint", "smallint", "mediumint", "int"]):
-        if "unsigned" in db_type:
-            return "uint"
-        return "int"
-    if db_type.startswith("bigint"):
-        if "unsigned" in db_type:
-            return "ulong"
-        return "long"
-    if any(db_type.startswith(t) for t in ["timestamp", "datetime"]):
-        return "DateTime"
-    if any(db_type.startswith(t) for t in ["varchar", "char", "tinytext", "mediumtext", "text", "longtext", "set", "enum", "geometry"]):
-        return "string"
-    if db_type.startswith("year"):
-        return "int"
-    if db_type.startswith("date"):
-        return "DateOnly"
-    if db_type.startswith("decimal"):
-        return "decimal"
-    if db_type.startswith("blob"):
-        return "byte[]"
-    raise ValueError(f"Unknown type: {db_type}")
+    key = find_type_key(db_type, TYPE_MAP)
+    if key is None:
+        raise ValueError(f"Unknown type: {db_type}")
+    if "unsigned" in db_type and key in UNSIGNED_TYPE_MAP:
+        return UNSIGNED_TYPE_MAP[key]
+    return TYPE_MAP[key]
+
+def bool_attr(element: ET.Element, name: str) -> bool:
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
 
 def resolve_type_from_column(column: ET.Element) -> str:
     db_type = column.get("DatabaseType").lower()
-    nullable = column.get("Nullable", "false").lower() == "true"
+    nullable = bool_attr(column, "Nullable")
     resolved_type = resolve_type(db_type)
     if nullable and resolved_type not in ["string", "byte[]"]:
         return resolved_type + "?"
     return resolved_type
 
-def get_class_lines(table: ET.Element):
+def emit_table(table: ET.Element, class_out: list, mapper_out: list):
     class_name = table.get("ClassName")
     table_comment = table.get("Comment")
 
-    yield ""
+    class_out.append("")
     if table_comment:
-        yield "/// <summary>"
-        yield f"/// {table_comment}"
-        yield "/// </summary>"
-    yield f"public partial class {class_name}"
-    yield "{"
-    
-    for column in table.findall("Column"):
+        class_out.append(CLASS_SUMMARY_TEMPLATE.format(comment=table_comment))
+    class_out.append(CLASS_OPEN_TEMPLATE.format(class_name=class_name))
+
+    mapper_items = []
+    for column in table.iterfind("Column"):
         field_name = column.get("FieldName")
         comment = column.get("Comment")
 
         if comment:
-            yield f"{INDENT}/// <summary>"
-            yield f"{INDENT}/// {comment}"
-            yield f"{INDENT}/// </summary>"
+            class_out.append(PROPERTY_SUMMARY_TEMPLATE.format(comment=comment))
 
         csharp_type = resolve_type_from_column(column)
-        yield f"{INDENT}public {csharp_type} {field_name} {{ get; set; }}"
+        class_out.append(PROPERTY_TEMPLATE.format(type_name=csharp_type, field_name=field_name))
+        mapper_items.append(MAPPER_ITEM_TEMPLATE.format(
+            column_name=column.get("Name"), class_name=class_name, field_name=field_name))
 
-    yield "}"
+    class_out.append("}")
 
-def get_mappers_lines(table: ET.Element) -> str:
-    class_name = table.get("ClassName")
-    items = [
-        f'("{col.get("Name")}", nameof({class_name}.{col.get("FieldName")}))'
-        for col in table.findall("Column")
-    ]
-    
-    if not items:
+    if not mapper_items:
         return
-    
-    yield f"{INDENT*2}Register<{class_name}>("
-    yield from (f"{INDENT*3}{line}," for line in items[:-1])
-    yield f"{INDENT*3}{items[-1]}"
-    yield f"{INDENT*2});"
-
-xml_data = sys.stdin.read()
-tree = ET.ElementTree(ET.fromstring(xml_data))
-root = tree.getroot()
-
-output_file = os.path.abspath(OUTPUT_PATH)
-
-mappers = []
-classes = []
-for db in root.findall("Database"):
-    for schema in db.findall("Schema"):
-        for table in schema.findall("Table"):
-            classes.extend(get_class_lines(table))
-            mappers.extend(get_mappers_lines(table))
-
-content_lines = [
-    "using System;",
-    "using System.ComponentModel.DataAnnotations;",
-    "using System.ComponentModel.DataAnnotations.Schema;",
-    "",
-    f"namespace {NAMESPACE};",
-]
-content_lines.extend(classes)
-
-content = NEWLINE.join(content_lines)
-with open(output_file, "w", encoding="utf-8", newline=NEWLINE) as f:
-    f.write(content)
-
-mappers_lines = [
-    "using Dapper;",
-    "namespace SakilaDapper.Model;",
-    "",
-    "public class MapperGenerated",
-    "{",
-    INDENT + "private static void Register<T>(params (string Column, string Property)[] map)",
-    INDENT + "{",
-    INDENT*2 + "var type = typeof(T);",
-    INDENT*2 + "var propMap = map.ToDictionary(",
-    INDENT*3 + "kvp => kvp.Column,",
-    INDENT*3 + "kvp => type.GetProperty(kvp.Property)",
-    INDENT*4 + "?? throw new InvalidOperationException($\"Property {kvp.Property} not found on {type}\")",
-    INDENT*2 + ");",
-    "",
-    INDENT*2 + "SqlMapper.SetTypeMap(typeof(T),",
-    INDENT*3 + "new CustomPropertyTypeMap(typeof(T),",
-    INDENT*3 + "(_, columnName) => propMap[columnName]",
-    INDENT*2 + "));",
-    INDENT + "}",
-    "",
-    INDENT + "public static void Register()",
-    INDENT + "{"
-]
-
-mappers_lines.extend(mappers)
-mappers_lines.append(INDENT + "}")
-mappers_lines.append("}")
-
-output_map_file = os.path.abspath(OUTPUT_MAP_PATH)
-map_content = NEWLINE.join(mappers_lines)
-with open(output_map_file, "w", encoding="utf-8", newline=NEWLINE) as f:
-    f.write(map_content)
\ No newline at end of file
+
+    mapper_out.append(f"{INDENT2}Register<{class_name}>(")
+    mapper_out.extend(item + "," for item in mapper_items[:-1])
+    mapper_out.append(mapper_items[-1])
+    mapper_out.append(f"{INDENT2});")
+
+def write_lines(path: str, lines):
+    with open(path, "w", encoding="utf-8", newline=NEWLINE, buffering=1 << 16) as f:
+        lines = iter(lines)
+        f.write(next(lines, ""))
+        f.writelines(NEWLINE + line for line in lines)
+
+def iter_tables(source):
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "Table":
+            yield element
+            element.clear()
+
+def main():
+    output_file = os.path.abspath(OUTPUT_PATH)
+
+    mappers = []
+    classes = []
+    for table in iter_tables(sys.stdin.buffer):
+        emit_table(table, classes, mappers)
+
+    header_lines = [
+        "using System;",
+        "using System.ComponentModel.DataAnnotations;",
+        "using System.ComponentModel.DataAnnotations.Schema;",
+        "",
+        f"namespace {NAMESPACE};",
+    ]
+    write_lines(output_file, chain(header_lines, classes))
+
+    mappers_header_lines = [
+        "using Dapper;",
+        "namespace SakilaDapper.Model;",
+        "",
+        "public class MapperGenerated",
+        "{",
+        INDENT + "private static void Register<T>(params (string Column, string Property)[] map)",
+        INDENT + "{",
+        INDENT2 + "var type = typeof(T);",
+        INDENT2 + "var propMap = map.ToDictionary(",
+        INDENT3 + "kvp => kvp.Column,",
+        INDENT3 + "kvp => type.GetProperty(kvp.Property)",
+        INDENT4 + "?? throw new InvalidOperationException($\"Property {kvp.Property} not found on {type}\")",
+        INDENT2 + ");",
+        "",
+        INDENT2 + "SqlMapper.SetTypeMap(typeof(T),",
+        INDENT3 + "new CustomPropertyTypeMap(typeof(T),",
+        INDENT3 + "(_, columnName) => propMap[columnName]",
+        INDENT2 + "));",
+        INDENT + "}",
+        "",
+        INDENT + "public static void Register()",
+        INDENT + "{"
+    ]
+
+    output_map_file = os.path.abspath(OUTPUT_MAP_PATH)
+    write_lines(output_map_file, chain(mappers_header_lines, mappers, [INDENT + "}", "}"]))
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,79 @@
 # Licensed under the MIT License (MIT)
 
+import re
 import sys
 import xml.etree.ElementTree as ET
 
 INDENT = "    "
+INDENT2 = INDENT * 2
 NEWLINE = "\n"
 ROOT_PATH = "models.py"
 
+# "national varchar(n)" and "nchar varying(n)" style synonyms keep their length argument
+TYPE_RE = re.compile(r"^(?:national )?([a-z]+)[^(]*(?:\(([^)]*)\))?")
+FIELD_TYPES = {
+    "tinyint": "SmallIntegerField",
+    "smallint": "SmallIntegerField",
+    "mediumint": "IntegerField",
+    "int": "IntegerField",
+    "integer": "IntegerField",
+    "bigint": "BigIntegerField",
+    "tinytext": "TextField",
+    "text": "TextField",
+    "mediumtext": "TextField",
+    "longtext": "TextField",
+    "char": "CharField",
+    "varchar": "CharField",
+    "character": "CharField",
+    "nchar": "CharField",
+    "nvarchar": "CharField",
+    "datetime": "DateTimeField",
+    "timestamp": "DateTimeField",
+    "decimal": "DecimalField",
+    "numeric": "DecimalField",
+    "float": "FloatField",
+    "double": "FloatField",
+    "real": "FloatField",
+}
+
+def bool_attr(element: ET.Element, name: str) -> bool:
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
+
 def resolve_type(column: ET.Element) -> str:
     args = []
     column_name = column.get("Name")
     args.append("db_column=\"" + column_name + "\"")
     db_type = column.get("DatabaseType").lower()
-    if column.get("Nullable", "false").lower() == "true":
+    if bool_attr(column, "Nullable"):
         args.append("null=True")
-    if column.get("PrimaryKey", "false").lower() == "true":
+    if bool_attr(column, "PrimaryKey"):
         args.append("primary_key=True")
 
-    db_type_args = []
-    if "(" in db_type:
-        parentheses_content = db_type.split('(')[1].split(')')[0]
-        db_type_args = parentheses_content.split(',')
-
-    if db_type.startswith("tinyint(1)"):
-        return f"models.BooleanField({", ".join(args)})"
-    if db_type.startswith("tinyint") or db_type.startswith("smallint"):
-        return f"models.SmallIntegerField({", ".join(args)})"
-    if db_type.startswith("int") or db_type.startswith("mediumint"):
-        return f"models.IntegerField({", ".join(args)})"
-    if db_type.startswith("bigint"):
-        return f"models.BigIntegerField({", ".join(args)})"
-    if "text" in db_type:
-        return f"models.TextField({", ".join(args)})"
-    if "char" in db_type:
-        if len(db_type_args) == 1:
-            args.insert(0, f"max_length={db_type_args[0]}")
-        return f"models.CharField({", ".join(args)})"
-    if "datetime" in db_type or "timestamp" in db_type:
-        return f"models.DateTimeField({", ".join(args)})"
-    if "decimal" in db_type or "numeric" in db_type:
-        precision = 20
-        scale = 6
+    match = TYPE_RE.match(db_type)
+    base, params = match.groups() if match else ("", None)
+    db_type_args = params.split(",") if params else []
+
+    if base == "tinyint" and db_type_args == ["1"]:
+        field = "BooleanField"
+    else:
+        field = FIELD_TYPES.get(base, "TextField")
+
+    if field == "CharField" and len(db_type_args) == 1:
+        args.insert(0, f"max_length={db_type_args[0]}")
+    elif field == "DecimalField":
         if len(db_type_args) == 2:
             precision, scale = db_type_args
-        args.append(f"max_digits=" + precision.strip())
-        args.append(f"decimal_places=" + scale.strip())
-        return f"models.DecimalField({", ".join(args)})"
-    if db_type in ("float", "double", "real"):
-        return f"models.FloatField({", ".join(args)})"
-    return f"models.TextField({", ".join(args)})"
+        else:
+            # MySQL reads DECIMAL(M) as DECIMAL(M,0) and a bare DECIMAL as DECIMAL(10,0)
+            precision, scale = (db_type_args[0] if db_type_args else "10"), "0"
+        args.append("max_digits=" + precision.strip())
+        args.append("decimal_places=" + scale.strip())
+    return f"models.{field}({', '.join(args)})"
 
 def generate_table(table: ET.Element) -> str:
-    pk_columns = [c for c in table.findall("Column") if c.get("PrimaryKey", "false").lower() == "true"]
+    columns = list(table.iterfind("Column"))
+    pk_columns = [c for c in columns if bool_attr(c, "PrimaryKey")]
     if len(pk_columns) > 1:
         print("Composite PK is not supported (table " + table.get("Name") + ")")
         return None
@@ -64,16 +86,17 @@ def generate_table(table: ET.Element) -> str:
     class_name = table.get("ClassName")
     lines = [f"class {class_name}(models.Model):"]
 
-    fk_column_names = {fk.get("FromColumn") for fk in table.findall("ForeignKey")}
+    fks = list(table.iterfind("ForeignKey"))
+    fk_column_names = frozenset(fk.get("FromColumn") for fk in fks)
 
-    for column in table.findall("Column"):
+    for column in columns:
         name = column.get("FieldName")
         column_name = column.get("Name")
         if column_name in fk_column_names:
             continue
 
-        is_pk = column.get("PrimaryKey", "false").lower() == "true"
-        auto = column.get("AutoIncrement", "false").lower() == "true"
+        is_pk = bool_attr(column, "PrimaryKey")
+        auto = bool_attr(column, "AutoIncrement")
 
         if is_pk and auto:
             lines.append(f"{INDENT}{name} = models.AutoField(primary_key=True)")
@@ -83,15 +106,15 @@ def generate_table(table: ET.Element) -> str:
         lines.append(f"{INDENT}{name} = {field}")
 
     # Foreign keys
-    for fk in table.findall("ForeignKey"):
+    for fk in fks:
         column_name = fk.get("FromColumn")
         field_name = fk.get("FieldName")
         target_class = fk.get("ToClassName")
         on_delete_sql = fk.get("OnDelete", "NO ACTION")
-        column = next((c for c in table.findall("Column") if c.get("Name") == column_name), None)
+        column = next((c for c in columns if c.get("Name") == column_name), None)
         
         args = [f"db_column=\"" + column_name + "\""]
-        if column.get("Nullable", "false").lower() == "true":
+        if bool_attr(column, "Nullable"):
             args.append("null=True")
 
         action_map = {
@@ -112,24 +135,32 @@ def generate_table(table: ET.Element) -> str:
     table_name = table.get("Name")
     lines.append("")
     lines.append(f"{INDENT}class Meta:")
-    lines.append(f"{INDENT*2}db_table = \"{table_name}\"")
+    lines.append(f"{INDENT2}db_table = \"{table_name}\"")
 
     lines.append("")
     return NEWLINE.join(lines)
 
-# main
-xml_data = sys.stdin.read()
-tree = ET.ElementTree(ET.fromstring(xml_data))
-root = tree.getroot()
+def write_lines(path: str, lines):
+    with open(path, "w", encoding="utf-8", newline=NEWLINE, buffering=1 << 16) as f:
+        lines = iter(lines)
+        f.write(next(lines, ""))
+        f.writelines(NEWLINE + line for line in lines)
+
+def iter_tables(source):
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "Table":
+            yield element
+            element.clear()
+
+def main():
+    output = ["from django.db import models", ""]
 
-output = ["from django.db import models", ""]
+    for table in iter_tables(sys.stdin.buffer):
+        model_code = generate_table(table)
+        if model_code:
+            output.append(model_code)
 
-for db in root.findall("Database"):
-    for schema in db.findall("Schema"):
-        for table in schema.findall("Table"):
-            model_code = generate_table(table)
-            if model_code:
-                output.append(model_code)
+    write_lines(ROOT_PATH, output)
 
-with open(ROOT_PATH, "w", encoding="utf-8", newline='') as f:
-    f.write(NEWLINE.join(output))
+if __name__ == "__main__":
+    main()
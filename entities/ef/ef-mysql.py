@@ -2,6 +2,9 @@
 
 import os
 import sys
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
 import xml.etree.ElementTree as ET
 
 INDENT = "\t"
@@ -10,40 +13,92 @@ OUTPUT_PATH = "../OrmFactoryCom/Model/DataContextGenerated.cs"
 NAMESPACE = "OrmFactoryCom.Model"
 CONTEXT_NAME = "DataContext"
 
+CLASS_SUMMARY_TEMPLATE = "/// <summary>" + NEWLINE + "///{comment}" + NEWLINE + "/// </summary>"
+CLASS_OPEN_TEMPLATE = (
+    "[Table(\"{table_name}\")]" + NEWLINE
+    + "public partial class {class_name}" + NEWLINE
+    + "{{"
+)
+PROPERTY_SUMMARY_TEMPLATE = (
+    INDENT + "/// <summary>" + NEWLINE
+    + INDENT + "///{comment}" + NEWLINE
+    + INDENT + "/// </summary>"
+)
+PROPERTY_TEMPLATE = INDENT + "public {type_name} {field_name} {{ get; set; }}"
+DBSET_TEMPLATE = INDENT + "public DbSet<{class_name}> {repository_name} {{ get; set; }}"
+
+ColumnInfo = namedtuple("ColumnInfo", "name field_name db_type nullable primary_key database_generated comment")
+
+def bool_attr(element: ET.Element, name: str) -> bool:
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
+
 def is_database_generated(column: ET.Element):
     default_value = column.get("Default")
     return default_value == "current_timestamp()"
 
+# keys are checked as prefixes in this order when the base type is not an exact match
+TYPE_MAP = {
+    "tinyint": "int",
+    "smallint": "int",
+    "mediumint": "int",
+    "int": "int",
+    "bigint": "long",
+    "timestamp": "DateTime",
+    "datetime": "DateTime",
+    "varchar": "string",
+    "char": "string",
+    "tinytext": "string",
+    "mediumtext": "string",
+    "text": "string",
+    "longtext": "string",
+    "set": "string",
+    "enum": "string",
+    "geometry": "string",
+    "year": "int",
+    "date": "DateOnly",
+    "decimal": "decimal",
+    "blob": "byte[]",
+}
+UNSIGNED_TYPE_MAP = {
+    "tinyint": "uint",
+    "smallint": "uint",
+    "mediumint": "uint",
+    "int": "uint",
+    "bigint": "ulong",
+}
+
+def find_type_key(db_type: str, type_map: dict) -> str | None:
+    base = db_type.split("(", 1)[0].split(" ", 1)[0]
+    if base in type_map:
+        return base
+    return next((key for key in type_map if db_type.startswith(key)), None)
+
+@lru_cache(maxsize=None)
 def resolve_type(db_type: str) -> str:
     if db_type.startswith("tinyint(1)"):
         return "bool"
-    if any(db_type.startswith(t) for t in ["tinyint", "smallint", "mediumint", "int"]):
-        if "unsigned" in db_type:
-            return "uint"
-        return "int"
-    if db_type.startswith("bigint"):
-        if "unsigned" in db_type:
-            return "ulong"
-        return "long"
-    if any(db_type.startswith(t) for t in ["timestamp", "datetime"]):
-        return "DateTime"
-    if any(db_type.startswith(t) for t in ["varchar", "char", "tinytext", "mediumtext", "text", "longtext", "set", "enum", "geometry"]):
-        return "string"
-    if db_type.startswith("year"):
-        return "int"
-    if db_type.startswith("date"):
-        return "DateOnly"
-    if db_type.startswith("decimal"):
-        return "decimal"
-    if db_type.startswith("blob"):
-        return "byte[]"
-    raise ValueError(f"Unknown type: {db_type}")
-
-def resolve_type_from_column(column: ET.Element) -> str:
-    db_type = column.get("DatabaseType").lower()
-    nullable = column.get("Nullable", "false").lower() == "true"
-    resolved_type = resolve_type(db_type)
-    if nullable:
+    key = find_type_key(db_type, TYPE_MAP)
+    if key is None:
+        raise ValueError(f"Unknown type: {db_type}")
+    if "unsigned" in db_type and key in UNSIGNED_TYPE_MAP:
+        return UNSIGNED_TYPE_MAP[key]
+    return TYPE_MAP[key]
+
+def read_column(column: ET.Element) -> ColumnInfo:
+    return ColumnInfo(
+        name=column.get("Name"),
+        field_name=column.get("FieldName"),
+        db_type=column.get("DatabaseType").lower(),
+        nullable=bool_attr(column, "Nullable"),
+        primary_key=bool(column.get("PrimaryKey")),
+        database_generated=is_database_generated(column),
+        comment=column.get("Comment"),
+    )
+
+def resolve_type_from_column(column: ColumnInfo) -> str:
+    resolved_type = resolve_type(column.db_type)
+    if column.nullable:
         return resolved_type + "?"
     return resolved_type
 
@@ -54,73 +109,66 @@ def get_class_lines(table: ET.Element):
     
     yield ""
     if table_comment:
-        yield f"/// <summary>"
-        yield f"///{table_comment}"
-        yield f"/// </summary>"
-    yield f"[Table(\"{table_name}\")]"
-    yield f"public partial class {class_name}"
-    yield "{"
-    columns_dict = {}
-    for column in table.findall("Column"):
-        column_name = column.get("Name")
-        field_name = column.get("FieldName")
-        comment = column.get("Comment")
-        columns_dict[column_name] = column
-        if comment:
-            yield f"{INDENT}/// <summary>"
-            yield f"{INDENT}///{comment}"
-            yield f"{INDENT}/// </summary>"
-        if column.get("PrimaryKey"):
+        yield CLASS_SUMMARY_TEMPLATE.format(comment=table_comment)
+    yield CLASS_OPEN_TEMPLATE.format(table_name=table_name, class_name=class_name)
+    columns = [read_column(column) for column in table.iterfind("Column")]
+    for column in columns:
+        if column.comment:
+            yield PROPERTY_SUMMARY_TEMPLATE.format(comment=column.comment)
+        if column.primary_key:
             yield f"{INDENT}[Key]"
-        elif is_database_generated(column):
+        elif column.database_generated:
             yield f"{INDENT}[DatabaseGenerated(DatabaseGeneratedOption.Computed)]"
-        if column_name != field_name:
-            yield f"{INDENT}[Column(\"{column_name}\")]"
+        if column.name != column.field_name:
+            yield f"{INDENT}[Column(\"{column.name}\")]"
         csharp_type = resolve_type_from_column(column)
-        yield f"{INDENT}public {csharp_type} {field_name} {{ get; set; }}"
+        yield PROPERTY_TEMPLATE.format(type_name=csharp_type, field_name=column.field_name)
+    columns_dict = {column.name: column for column in columns}
     for fk in table.findall("ForeignKey"):
         from_col = fk.get('FromColumn')
         field_name = fk.get('FieldName')
         class_type = fk.get('ToClassName')
         from_column = columns_dict[from_col]
-        from_field_name = from_column.get("FieldName")
-        is_nullable = from_column.get("Nullable", "false").lower() == "true"
-        yield f"{INDENT}[ForeignKey(\"{from_field_name}\")]"
-        if is_nullable:
+        yield f"{INDENT}[ForeignKey(\"{from_column.field_name}\")]"
+        if from_column.nullable:
             class_type = class_type + "?"
-        yield f"{INDENT}public {class_type} {field_name} {{ get; set; }}"
+        yield PROPERTY_TEMPLATE.format(type_name=class_type, field_name=field_name)
     yield "}"
 
-xml_data = sys.stdin.read()
-tree = ET.ElementTree(ET.fromstring(xml_data))
-root = tree.getroot()
-
-output_file = os.path.abspath(OUTPUT_PATH)
-
-dbsets = []
-classes = []
-
-for db in root.findall('Database'):
-    for schema in db.findall('Schema'):
-        for table in schema.findall('Table'):
-            class_name = table.get("ClassName")
-            repository_name = table.get("RepositoryName")
-            dbsets.append(f"{INDENT}public DbSet<{class_name}> {repository_name} {{ get; set; }}")
-            classes.extend(get_class_lines(table))
-content_lines = [
-    "using System;",
-    "using System.ComponentModel.DataAnnotations;",
-    "using System.ComponentModel.DataAnnotations.Schema;",
-    "using Microsoft.EntityFrameworkCore;",
-    "",
-    f"namespace {NAMESPACE};",
-    "",
-    f"public partial class {CONTEXT_NAME} : DbContext",
-    "{"]
-content_lines.extend(dbsets)
-content_lines.append("}")
-content_lines.extend(classes)
-
-content = NEWLINE.join(content_lines)
-with open(output_file, "w", encoding="utf-8", newline=NEWLINE) as f:
-    f.write(content)
\ No newline at end of file
+def write_lines(path: str, lines):
+    with open(path, "w", encoding="utf-8", newline=NEWLINE, buffering=1 << 16) as f:
+        lines = iter(lines)
+        f.write(next(lines, ""))
+        f.writelines(NEWLINE + line for line in lines)
+
+def iter_tables(source):
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "Table":
+            yield element
+            element.clear()
+
+def main():
+    output_file = os.path.abspath(OUTPUT_PATH)
+
+    dbsets = []
+    classes = []
+
+    for table in iter_tables(sys.stdin.buffer):
+        class_name = table.get("ClassName")
+        repository_name = table.get("RepositoryName")
+        dbsets.append(DBSET_TEMPLATE.format(class_name=class_name, repository_name=repository_name))
+        classes.extend(get_class_lines(table))
+    header_lines = [
+        "using System;",
+        "using System.ComponentModel.DataAnnotations;",
+        "using System.ComponentModel.DataAnnotations.Schema;",
+        "using Microsoft.EntityFrameworkCore;",
+        "",
+        f"namespace {NAMESPACE};",
+        "",
+        f"public partial class {CONTEXT_NAME} : DbContext",
+        "{"]
+    write_lines(output_file, chain(header_lines, dbsets, ["}"], classes))
+
+if __name__ == "__main__":
+    main()
@@ -2,170 +2,261 @@
 
 import os
 import sys
-from typing import List
+from functools import lru_cache
+from itertools import chain, islice
+from typing import List, Tuple
 import xml.etree.ElementTree as ET
 
 PACKAGE_NAME = "com.example"
 INDENT = "    "
-NEWLINE = "\n"
+INDENT2 = INDENT * 2
 ROOT_PATH = "Models"
+# set to a .zip path (e.g. "Models.zip") to pack all generated files into one archive instead of ROOT_PATH
+ARCHIVE_PATH = None
+# the first this many tables are generated in-process; only the rest of a larger schema goes to worker processes
+PARALLEL_MIN_TABLES = 2000
 
-def resolve_type(column: ET.Element) -> str:
-    db_type = column.get("DatabaseType").lower()
-    nullable = column.get("Nullable", "false").lower() == "true"
+ACCESSORS_TEMPLATE = (
+    INDENT + "public void set{field_name}({field_type} {lower}) {{\n"
+    + INDENT2 + "this.{lower} = {lower};\n"
+    + INDENT + "}}\n"
+    "\n"
+    + INDENT + "public {field_type} get{field_name}() {{\n"
+    + INDENT2 + "return {lower};\n"
+    + INDENT + "}}\n"
+    "\n"
+)
+FIELD_TEMPLATE = INDENT + "private {field_type} {lower};\n"
+COLUMN_TEMPLATE = INDENT + "@Column(name = \"{column_name}\")\n{comment}" + FIELD_TEMPLATE + "\n"
+MANY_TO_ONE_TEMPLATE = (
+    INDENT + "@ManyToOne(fetch = FetchType.LAZY)\n"
+    + INDENT + "@JoinColumn(name = \"{column_name}\", insertable=false, updatable=false)\n"
+    + FIELD_TEMPLATE
+)
+ONE_TO_MANY_TEMPLATE = INDENT + "@OneToMany(mappedBy = \"{mapped_by}\", fetch = FetchType.LAZY)\n" + FIELD_TEMPLATE
+ENTITY_TEMPLATE = (
+    "package " + PACKAGE_NAME + ".model;\n"
+    "\n"
+    "{imports}"
+    "\n"
+    "{annotations}"
+    "public class {class_name} {{\n"
+    "{fields}"
+    "{accessors}"
+    "}}"
+)
+COMPOSITE_KEY_TEMPLATE = (
+    "package " + PACKAGE_NAME + ".model;\n"
+    "\n"
+    "public class {class_name} {{\n"
+    "{fields}"
+    "}}"
+)
+REPOSITORY_TEMPLATE = (
+    "package " + PACKAGE_NAME + ".model;\n"
+    "\n"
+    "import org.springframework.data.repository.CrudRepository;\n"
+    "import " + PACKAGE_NAME + ".model.{class_name};\n"
+    "\n"
+    "public interface {class_name}Repository extends CrudRepository<{class_name}, {key_type}> {{\n"
+    "}}"
+)
+
+# keys are checked as prefixes in this order when the base type is not an exact match
+TYPE_MAP = {
+    "tinyint": "Integer",
+    "smallint": "Integer",
+    "mediumint": "Integer",
+    "int": "Integer",
+    "timestamp": "java.time.LocalDateTime",
+    "datetime": "java.time.LocalDateTime",
+    "varchar": "String",
+    "char": "String",
+    "text": "String",
+    "set": "String",
+    "enum": "String",
+    "geometry": "String",
+    "year": "Integer",
+    "decimal": "java.math.BigDecimal",
+    "blob": "byte[]",
+}
+
+def find_type_key(db_type: str, type_map: dict) -> str | None:
+    base = db_type.split("(", 1)[0].split(" ", 1)[0]
+    if base in type_map:
+        return base
+    return next((key for key in type_map if db_type.startswith(key)), None)
 
+@lru_cache(maxsize=None)
+def resolve_db_type(db_type: str) -> str:
     if db_type.startswith("tinyint(1)"):
         return "Boolean"
-    if any(db_type.startswith(t) for t in ["tinyint", "smallint", "mediumint", "int"]):
-        return "Integer"
-    if any(db_type.startswith(t) for t in ["timestamp", "datetime"]):
-        return "java.time.LocalDateTime"
-    if any(db_type.startswith(t) for t in ["varchar", "char", "text", "set", "enum", "geometry"]):
-        return "String"
-    if db_type.startswith("year"):
-        return "Integer"
-    if db_type.startswith("decimal"):
-        return "java.math.BigDecimal"
-    if db_type.startswith("blob"):
-        return "byte[]"
-    raise ValueError(f"Unknown type: {db_type}")
+    key = find_type_key(db_type, TYPE_MAP)
+    if key is None:
+        raise ValueError(f"Unknown type: {db_type}")
+    return TYPE_MAP[key]
 
+def resolve_type(column: ET.Element) -> str:
+    return resolve_db_type(column.get("DatabaseType").lower())
+
+@lru_cache(maxsize=None)
 def lower_first_char(s: str) -> str:
     return s[:1].lower() + s[1:] if s else s
 
 def generate_composite_key_class(composite_key_class_name: str, key_columns: List[ET.Element]) -> str:
-    lines = [f"package {PACKAGE_NAME}.model;", "", f"public class {composite_key_class_name} {{"]
+    fields = []
     for column in key_columns:
         field_name = column.get("FieldName")
         java_type = resolve_type(column)
-        lines.append(f"{INDENT}private {java_type} {lower_first_char(field_name)};")
-        lines.append("")
-        lines.extend(generate_field_accessors(field_name, java_type))
-    lines.append("}")
-    return NEWLINE.join(lines)
+        fields.append(FIELD_TEMPLATE.format(field_type=java_type, lower=lower_first_char(field_name)))
+        fields.append("\n")
+        fields.append(generate_field_accessors(field_name, java_type))
+    return COMPOSITE_KEY_TEMPLATE.format(class_name=composite_key_class_name, fields="".join(fields))
 
 def write_file(directory: str, filename: str, content: str):
-    with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
-        f.write(content)
+    with open(os.path.join(directory, filename), "wb") as f:
+        f.write(content.encode("utf-8"))
 
-def generate_field_accessors(field_name: str, field_type: str) -> List[str]:
+def write_archive(path: str, files):
+    # imported here so the default per-file output does not pay for loading zipfile
+    import zipfile
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for filename, content in files:
+            archive.writestr(filename, content)
+
+def generate_field_accessors(field_name: str, field_type: str) -> str:
     lower = lower_first_char(field_name)
-    return [
-        f"{INDENT}public void set{field_name}({field_type} {lower}) {{",
-        f"{INDENT*2}this.{lower} = {lower};",
-        f"{INDENT}}}",
-        "",
-        f"{INDENT}public {field_type} get{field_name}() {{",
-        f"{INDENT*2}return {lower};",
-        f"{INDENT}}}",
-        ""
-    ]
+    return ACCESSORS_TEMPLATE.format(field_name=field_name, field_type=field_type, lower=lower)
 
 def generate_table_entity(table: ET.Element, composite_key_class_name: str | None) -> str:
     fields = []
     accessors = []
-    imports = ["import jakarta.persistence.*;"]
+    imports = ["import jakarta.persistence.*;\n"]
 
     for column in table.findall("Column"):
-        column_name = column.get("Name")
         field_name = column.get("FieldName")
         comment = column.get("Comment")
-        
+
         if column.get("PrimaryKey"):
-            fields.append(f"{INDENT}@Id")
+            fields.append(f"{INDENT}@Id\n")
             if column.get("AutoIncrement"):
-                fields.append(f"{INDENT}@GeneratedValue(strategy=GenerationType.AUTO)")
-
-        fields.append(f"{INDENT}@Column(name = \"{column_name}\")")
-
-        if comment:
-            fields.append(f"{INDENT}/** {comment} */")
+                fields.append(f"{INDENT}@GeneratedValue(strategy=GenerationType.AUTO)\n")
 
         java_type = resolve_type(column)
-        fields.append(f"{INDENT}private {java_type} {lower_first_char(field_name)};")
-        fields.append("")
-        accessors.extend(generate_field_accessors(field_name, java_type))
+        fields.append(COLUMN_TEMPLATE.format(
+            column_name=column.get("Name"),
+            comment=f"{INDENT}/** {comment} */\n" if comment else "",
+            field_type=java_type,
+            lower=lower_first_char(field_name),
+        ))
+        accessors.append(generate_field_accessors(field_name, java_type))
 
     for fk in table.findall('ForeignKey'):
-        from_col = fk.get('FromColumn')
         field_name = fk.get('FieldName')
         type_decl = fk.get('ClassName')
-        fields.append(f"{INDENT}@ManyToOne(fetch = FetchType.LAZY)")
-        fields.append(f"{INDENT}@JoinColumn(name = \"{from_col}\", insertable=false, updatable=false)")
-        fields.append(f"{INDENT}private {type_decl} {lower_first_char(field_name)};")
-        accessors.extend(generate_field_accessors(field_name, type_decl))
+        fields.append(MANY_TO_ONE_TEMPLATE.format(
+            column_name=fk.get('FromColumn'),
+            field_type=type_decl,
+            lower=lower_first_char(field_name),
+        ))
+        accessors.append(generate_field_accessors(field_name, type_decl))
 
     reverse_keys = table.findall('ReverseKey')
     if reverse_keys:
-        imports.append("import java.util.List;")
+        imports.append("import java.util.List;\n")
     for fk in reverse_keys:
-        target = fk.get('ToClassName')
-        to_field_name = fk.get('ToFieldName')
         field_name = fk.get('FieldName')
-        lowerFieldName = lower_first_char(to_field_name)
-        fields.append(f"{INDENT}@OneToMany(mappedBy = \"{lowerFieldName}\", fetch = FetchType.LAZY)")
-        fields.append(f"{INDENT}private List<{target}> {lower_first_char(field_name)};")
-        accessors.extend(generate_field_accessors(field_name, f"List<{target}>"))
+        field_type = f"List<{fk.get('ToClassName')}>"
+        fields.append(ONE_TO_MANY_TEMPLATE.format(
+            mapped_by=lower_first_char(fk.get('ToFieldName')),
+            field_type=field_type,
+            lower=lower_first_char(field_name),
+        ))
+        accessors.append(generate_field_accessors(field_name, field_type))
 
     table_name = table.findtext('TableName')
     class_name = table.findtext('ClassName')
     comment = table.findtext('Comment')
 
-    lines = [
-        f"package {PACKAGE_NAME}.model;",
-        "",
-        *imports,
-        ""
-    ]
+    annotations = []
     if composite_key_class_name:
-        lines.append(f"import {PACKAGE_NAME}.model.{composite_key_class_name};")
-    lines.append("@Entity")
-    lines.append(f"@Table(name = \"{table_name}\")")
+        annotations.append(f"import {PACKAGE_NAME}.model.{composite_key_class_name};\n")
+    annotations.append("@Entity\n")
+    annotations.append(f"@Table(name = \"{table_name}\")\n")
     if composite_key_class_name:
-        lines.append(f"@IdClass({composite_key_class_name}.class)")
+        annotations.append(f"@IdClass({composite_key_class_name}.class)\n")
     if comment:
-        lines.append(f"/** {comment} */")
-    lines.append(f"public class {class_name} {{")
-    lines.extend(fields)
-    lines.extend(accessors)
-    lines.append("}")
-    return NEWLINE.join(lines)
+        annotations.append(f"/** {comment} */\n")
+
+    return ENTITY_TEMPLATE.format(
+        imports="".join(imports),
+        annotations="".join(annotations),
+        class_name=class_name,
+        fields="".join(fields),
+        accessors="".join(accessors),
+    )
 
 def generate_table_repository(class_name: str, key_type: str) -> str:
-    return NEWLINE.join([
-        f"package {PACKAGE_NAME}.model;",
-        "",
-        "import org.springframework.data.repository.CrudRepository;",
-        f"import {PACKAGE_NAME}.model.{class_name};",
-        "",
-        f"public interface {class_name}Repository extends CrudRepository<{class_name}, {key_type}> {{",
-        "}"
-    ])
-
-# main
-xml_data = sys.stdin.read()
-tree = ET.ElementTree(ET.fromstring(xml_data))
-root = tree.getroot()
-output_dir = os.path.abspath(ROOT_PATH)
-os.makedirs(output_dir, exist_ok=True)
-
-for db in root.findall('Database'):
-    for schema in db.findall('Schema'):
-        for table in schema.findall('Table'):
-            composite_key_class_name = None
-            primary_keys = [col for col in table.findall('Column') if col.get('PrimaryKey')]
-            class_name = table.get("ClassName")
-
-            if len(primary_keys) > 1:
-                composite_key_class_name = class_name + "Id"
-                composite_key_code = generate_composite_key_class(composite_key_class_name, primary_keys)
-                write_file(output_dir, composite_key_class_name + ".java", composite_key_code)
-
-            if primary_keys:
-                entity_code = generate_table_entity(table, composite_key_class_name)
-                write_file(output_dir, class_name + ".java", entity_code)
-    
-                pk_column = primary_keys[0];
-                key_type = resolve_type(pk_column)
-                repository_code = generate_table_repository(class_name, composite_key_class_name or key_type)
-                write_file(output_dir, class_name + "Repository.java", repository_code)
+    return REPOSITORY_TEMPLATE.format(class_name=class_name, key_type=key_type)
+
+def iter_tables(source):
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "Table":
+            yield element
+            element.clear()
+
+def generate_table_files(table: ET.Element) -> List[Tuple[str, str]]:
+    files = []
+    composite_key_class_name = None
+    primary_keys = [col for col in table.findall('Column') if col.get('PrimaryKey')]
+    class_name = table.get("ClassName")
+
+    if len(primary_keys) > 1:
+        composite_key_class_name = class_name + "Id"
+        composite_key_code = generate_composite_key_class(composite_key_class_name, primary_keys)
+        files.append((composite_key_class_name + ".java", composite_key_code))
+
+    if primary_keys:
+        entity_code = generate_table_entity(table, composite_key_class_name)
+        files.append((class_name + ".java", entity_code))
+
+        pk_column = primary_keys[0]
+        key_type = resolve_type(pk_column)
+        repository_code = generate_table_repository(class_name, composite_key_class_name or key_type)
+        files.append((class_name + "Repository.java", repository_code))
+    return files
+
+def generate_serialized_table_files(table_xml: bytes) -> List[Tuple[str, str]]:
+    return generate_table_files(ET.fromstring(table_xml))
+
+def generate_files(tables):
+    tables = iter(tables)
+    if (os.cpu_count() or 1) < 2:
+        yield from map(generate_table_files, tables)
+        return
+    yield from map(generate_table_files, islice(tables, PARALLEL_MIN_TABLES))
+    first = next(tables, None)
+    if first is None:
+        return
+    # tables are independent, so the rest of a large schema is spread over worker processes
+    serialized = (ET.tostring(table) for table in chain([first], tables))
+    # imported here so runs that never start a pool skip loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as executor:
+        yield from executor.map(generate_serialized_table_files, serialized, chunksize=16)
+
+def main():
+    tables = iter_tables(sys.stdin.buffer)
+    files = (file for table_files in generate_files(tables) for file in table_files)
+
+    if ARCHIVE_PATH:
+        write_archive(os.path.abspath(ARCHIVE_PATH), files)
+        return
+
+    output_dir = os.path.abspath(ROOT_PATH)
+    os.makedirs(output_dir, exist_ok=True)
+    for filename, content in files:
+        write_file(output_dir, filename, content)
+
+if __name__ == "__main__":
+    main()
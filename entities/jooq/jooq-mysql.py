@@ -2,69 +2,162 @@
 
 import os
 import sys
+from functools import lru_cache
+from itertools import chain, islice
 import xml.etree.ElementTree as ET
 
 PACKAGE_NAME = "com.example.jooq"
 INDENT = "    "
-NEWLINE = "\n"
+INDENT2 = INDENT * 2
 ROOT_PATH = "../src/main/java/com/example/jooq"
+# set to a .zip path (e.g. "jooq-tables.zip") to pack all generated files into one archive instead of ROOT_PATH
+ARCHIVE_PATH = None
+# the first this many tables are generated in-process; only the rest of a larger schema goes to worker processes
+PARALLEL_MIN_TABLES = 2000
 
+CLASS_HEADER = (
+    f"package {PACKAGE_NAME};\n"
+    "\n"
+    "import org.jooq.*;\n"
+    "import org.jooq.Record;\n"
+    "import org.jooq.impl.*;\n"
+    "import org.jooq.impl.Internal;\n"
+    "import java.math.*;\n"
+    "import java.time.*;\n"
+    "\n"
+)
+TABLE_COMMENT_TEMPLATE = "/** {comment} */\n"
+CLASS_OPEN_TEMPLATE = (
+    "public class {class_name} extends TableImpl<Record> {{\n"
+    "\n"
+    + INDENT + "public static final {class_name} {instance_name} = new {class_name}();\n"
+    "\n"
+)
+COMMENT_TEMPLATE = INDENT + TABLE_COMMENT_TEMPLATE
+COLUMN_TEMPLATE = (
+    INDENT + "public final TableField<Record, {java_type}> {field_name} = "
+    "createField(DSL.name(\"{column_name}\"), {sql_type}{nullable_clause}, this);\n"
+    "\n"
+)
+PRIMARY_KEY_TEMPLATE = INDENT + "public final UniqueKey<Record> PK = Internal.createUniqueKey(this, {fields});\n\n"
+FOREIGN_KEY_TEMPLATE = (
+    INDENT + "public final ForeignKey<Record, Record> {field_name} = Internal.createForeignKey(\n"
+    + INDENT2 + "this,\n"
+    + INDENT2 + "DSL.name(\"{fk_name}\"),\n"
+    + INDENT2 + "new TableField[]{{ {from_field_name} }},\n"
+    + INDENT2 + "{to_table}.PK,\n"
+    + INDENT2 + "new TableField[]{{ {to_table}.{to_field} }},\n"
+    + INDENT2 + "{enforced}\n"
+    + INDENT + ");\n"
+    "\n"
+)
+CONSTRUCTOR_TEMPLATE = (
+    INDENT + "private {class_name}() {{\n"
+    + INDENT2 + "super(DSL.name(\"{table_name}\"));\n"
+    + INDENT + "}}\n"
+    "}}"
+)
 
-def resolve_type(column: ET.Element) -> str:
-    db_type = column.get("DatabaseType", "").lower()
+
+# keys are checked as prefixes in this order when the base type is not an exact match
+TYPE_MAP = {
+    "tinyint": "Integer",
+    "smallint": "Integer",
+    "mediumint": "Integer",
+    "int": "Integer",
+    "timestamp": "java.time.LocalDateTime",
+    "datetime": "java.time.LocalDateTime",
+    "varchar": "String",
+    "char": "String",
+    "text": "String",
+    "set": "String",
+    "enum": "String",
+    "geometry": "String",
+    "year": "Integer",
+    "decimal": "java.math.BigDecimal",
+    "blob": "byte[]",
+}
+SQL_TYPE_MAP = {
+    "tinyint": "SQLDataType.INTEGER",
+    "smallint": "SQLDataType.INTEGER",
+    "mediumint": "SQLDataType.INTEGER",
+    "int": "SQLDataType.INTEGER",
+    "timestamp": "SQLDataType.LOCALDATETIME",
+    "datetime": "SQLDataType.LOCALDATETIME",
+    "varchar": "SQLDataType.VARCHAR",
+    "char": "SQLDataType.VARCHAR",
+    "text": "SQLDataType.VARCHAR",
+    "set": "SQLDataType.VARCHAR",
+    "enum": "SQLDataType.VARCHAR",
+    "geometry": "SQLDataType.VARCHAR",
+    "year": "SQLDataType.INTEGER",
+    "decimal": "SQLDataType.DECIMAL",
+    "blob": "SQLDataType.BLOB",
+}
+
+
+def find_type_key(db_type: str, type_map: dict) -> str | None:
+    base = db_type.split("(", 1)[0].split(" ", 1)[0]
+    if base in type_map:
+        return base
+    return next((key for key in type_map if db_type.startswith(key)), None)
+
+
+def bool_attr(element: ET.Element, name: str) -> bool:
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
+
+
+@lru_cache(maxsize=None)
+def resolve_db_type(db_type: str) -> str:
     if db_type.startswith("tinyint(1)"):
         return "Boolean"
-    if any(db_type.startswith(t) for t in ["tinyint", "smallint", "mediumint", "int"]):
-        return "Integer"
-    if any(db_type.startswith(t) for t in ["timestamp", "datetime"]):
-        return "java.time.LocalDateTime"
-    if any(db_type.startswith(t) for t in ["varchar", "char", "text", "set", "enum", "geometry"]):
-        return "String"
-    if db_type.startswith("year"):
-        return "Integer"
-    if db_type.startswith("decimal"):
-        return "java.math.BigDecimal"
-    if db_type.startswith("blob"):
-        return "byte[]"
-    raise ValueError(f"Unknown type: {db_type}")
+    key = find_type_key(db_type, TYPE_MAP)
+    if key is None:
+        raise ValueError(f"Unknown type: {db_type}")
+    return TYPE_MAP[key]
 
 
-def resolve_sql_datatype(column: ET.Element) -> str:
-    db_type = column.get("DatabaseType", "").lower()
-    length = column.get("Length")
-    base = None
+def resolve_type(column: ET.Element) -> str:
+    return resolve_db_type(column.get("DatabaseType", "").lower())
 
+
+@lru_cache(maxsize=None)
+def resolve_sql_db_type(db_type: str, length: str | None, nullable: bool) -> str:
     if db_type.startswith("tinyint(1)"):
         base = "SQLDataType.BOOLEAN"
-    elif any(db_type.startswith(t) for t in ["tinyint", "smallint", "mediumint", "int"]):
-        base = "SQLDataType.INTEGER"
-    elif any(db_type.startswith(t) for t in ["timestamp", "datetime"]):
-        base = "SQLDataType.LOCALDATETIME"
-    elif any(db_type.startswith(t) for t in ["varchar", "char", "text", "set", "enum", "geometry"]):
-        base = f"SQLDataType.VARCHAR({length})" if length else "SQLDataType.VARCHAR"
-    elif db_type.startswith("year"):
-        base = "SQLDataType.INTEGER"
-    elif db_type.startswith("decimal"):
-        base = "SQLDataType.DECIMAL"
-    elif db_type.startswith("blob"):
-        base = "SQLDataType.BLOB"
     else:
-        base = "SQLDataType.OTHER"
+        key = find_type_key(db_type, SQL_TYPE_MAP)
+        base = SQL_TYPE_MAP[key] if key else "SQLDataType.OTHER"
+        if length and base == "SQLDataType.VARCHAR":
+            base = f"{base}({length})"
 
-    nullable = column.get("Nullable")
-    if nullable and nullable.lower() == "true":
+    if nullable:
         return f"{base}.nullable(true)"
     return base
 
 
+def resolve_sql_datatype(column: ET.Element) -> str:
+    db_type = column.get("DatabaseType", "").lower()
+    nullable = bool_attr(column, "Nullable")
+    return resolve_sql_db_type(db_type, column.get("Length"), nullable)
+
+
 def lower_first(s: str) -> str:
     return s[:1].lower() + s[1:] if s else s
 
 
 def write_file(directory: str, filename: str, content: str):
-    os.makedirs(directory, exist_ok=True)
-    with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
-        f.write(content)
+    with open(os.path.join(directory, filename), "wb") as f:
+        f.write(content.encode("utf-8"))
+
+
+def write_archive(path: str, files):
+    # imported here so the default per-file output does not pay for loading zipfile
+    import zipfile
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for filename, content in files:
+            archive.writestr(filename, content)
 
 
 def generate_table_class(table: ET.Element) -> str:
@@ -72,25 +165,12 @@ def generate_table_class(table: ET.Element) -> str:
     class_name = table.get("ClassName")
     comment = table.get("Comment")
 
-    lines = [
-        f"package {PACKAGE_NAME};",
-        "",
-        "import org.jooq.*;",
-        "import org.jooq.Record;",
-        "import org.jooq.impl.*;",
-        "import org.jooq.impl.Internal;",
-        "import java.math.*;",
-        "import java.time.*;",
-        "",
-    ]
+    parts = [CLASS_HEADER]
 
     if comment:
-        lines.append(f"/** {comment} */")
+        parts.append(TABLE_COMMENT_TEMPLATE.format(comment=comment))
 
-    lines.append(f"public class {class_name} extends TableImpl<Record> {{")
-    lines.append("")
-    lines.append(f"{INDENT}public static final {class_name} {class_name.upper()} = new {class_name}();")
-    lines.append("")
+    parts.append(CLASS_OPEN_TEMPLATE.format(class_name=class_name, instance_name=class_name.upper()))
 
     pk_columns = []
     column_name_to_field = {}
@@ -100,74 +180,90 @@ def generate_table_class(table: ET.Element) -> str:
         field_name = column.get("FieldName")
         column_name = column.get("Name")
         column_name_to_field[column_name] = field_name
-        java_type = resolve_type(column)
-        sql_type = resolve_sql_datatype(column)
         col_comment = column.get("Comment")
-        nullable = column.get("Nullable", "false").lower() == "true"
-        nullable_clause = ""
-        if nullable == False:
-            nullable_clause = ".nullable(false)"
+        nullable_clause = "" if bool_attr(column, "Nullable") else ".nullable(false)"
 
         if col_comment:
-            lines.append(f"{INDENT}/** {col_comment} */")
+            parts.append(COMMENT_TEMPLATE.format(comment=col_comment))
 
-        lines.append(
-            f"{INDENT}public final TableField<Record, {java_type}> {field_name} = "
-            f"createField(DSL.name(\"{column_name}\"), {sql_type}{nullable_clause}, this);"
-        )
-        lines.append("")
+        parts.append(COLUMN_TEMPLATE.format(
+            java_type=resolve_type(column),
+            field_name=field_name,
+            column_name=column_name,
+            sql_type=resolve_sql_datatype(column),
+            nullable_clause=nullable_clause,
+        ))
 
-        if column.get("PrimaryKey", "").lower() == "true":
+        if bool_attr(column, "PrimaryKey"):
             pk_columns.append(field_name)
 
     # Primary key
     if pk_columns:
-        joined = ", ".join(pk_columns)
-        lines.append(f"{INDENT}public final UniqueKey<Record> PK = Internal.createUniqueKey(this, {joined});")
-        lines.append("")
+        parts.append(PRIMARY_KEY_TEMPLATE.format(fields=", ".join(pk_columns)))
 
     # Foreign keys
     for fk in table.findall("ForeignKey"):
-        fk_name = fk.get("Name")
-        field_name = fk.get("FieldName")
-        from_column = fk.get("FromColumn")
         to_class = fk.get("ToClassName")
-        to_field = fk.get("ToFieldName")
-        is_virtual = fk.get("Virtual", "false").lower() == "true"
-        enforced = "false" if is_virtual else "true"
-        from_field_name = column_name_to_field.get(from_column)
-
-        lines.append(f"{INDENT}public final ForeignKey<Record, Record> {field_name} = Internal.createForeignKey(")
-        lines.append(f"{INDENT*2}this,")
-        lines.append(f"{INDENT*2}DSL.name(\"{fk_name}\"),")
-        lines.append(f"{INDENT*2}new TableField[]{{ {from_field_name} }},")
-        lines.append(f"{INDENT*2}{PACKAGE_NAME}.{to_class}.{to_class.upper()}.PK,")
-        lines.append(f"{INDENT*2}new TableField[]{{ {PACKAGE_NAME}.{to_class}.{to_class.upper()}.{to_field} }},")
-        lines.append(f"{INDENT*2}{enforced}")
-        lines.append(f"{INDENT});")
-        lines.append("")
+        parts.append(FOREIGN_KEY_TEMPLATE.format(
+            field_name=fk.get("FieldName"),
+            fk_name=fk.get("Name"),
+            from_field_name=column_name_to_field.get(fk.get("FromColumn")),
+            to_table=f"{PACKAGE_NAME}.{to_class}.{to_class.upper()}",
+            to_field=fk.get("ToFieldName"),
+            enforced="false" if bool_attr(fk, "Virtual") else "true",
+        ))
 
     # Constructor
-    lines.append(f"{INDENT}private {class_name}() {{")
-    lines.append(f"{INDENT*2}super(DSL.name(\"{table_name}\"));")
-    lines.append(f"{INDENT}}}")
-    lines.append("}")
+    parts.append(CONSTRUCTOR_TEMPLATE.format(class_name=class_name, table_name=table_name))
 
-    return NEWLINE.join(lines)
+    return "".join(parts)
     
 
+def iter_tables(source):
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "Table":
+            yield element
+            element.clear()
+
+
+def generate_table_file(table: ET.Element) -> tuple[str, str]:
+    code = generate_table_class(table)
+    class_name = table.get("ClassName")
+    return f"{class_name}.java", code
+
+
+def generate_serialized_table_file(table_xml: bytes) -> tuple[str, str]:
+    return generate_table_file(ET.fromstring(table_xml))
+
+
+def generate_files(tables):
+    tables = iter(tables)
+    if (os.cpu_count() or 1) < 2:
+        yield from map(generate_table_file, tables)
+        return
+    yield from map(generate_table_file, islice(tables, PARALLEL_MIN_TABLES))
+    first = next(tables, None)
+    if first is None:
+        return
+    # tables are independent, so the rest of a large schema is spread over worker processes
+    serialized = (ET.tostring(table) for table in chain([first], tables))
+    # imported here so runs that never start a pool skip loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as executor:
+        yield from executor.map(generate_serialized_table_file, serialized, chunksize=16)
+
+
 def main():
-    xml_data = sys.stdin.read()
-    tree = ET.ElementTree(ET.fromstring(xml_data))
-    root = tree.getroot()
-    output_dir = os.path.abspath(ROOT_PATH)
+    files = generate_files(iter_tables(sys.stdin.buffer))
+
+    if ARCHIVE_PATH:
+        write_archive(os.path.abspath(ARCHIVE_PATH), files)
+        return
 
-    for db in root.findall("Database"):
-        for schema in db.findall("Schema"):
-            for table in schema.findall("Table"):
-                code = generate_table_class(table)
-                class_name = table.get("ClassName")
-                write_file(output_dir, f"{class_name}.java", code)
+    output_dir = os.path.abspath(ROOT_PATH)
+    os.makedirs(output_dir, exist_ok=True)
+    for filename, code in files:
+        write_file(output_dir, filename, code)
 
 
 if __name__ == "__main__":
@@ -2,122 +2,157 @@
 
 import os
 import sys
+import time
 import xml.etree.ElementTree as ET
-from datetime import datetime
 
 INDENT = "    "
+INDENT2 = INDENT * 2
 NEWLINE = "\n"
 
-up = []
-down = []
-actions = []
+SCHEMA_CREATE_TEMPLATE = "Schema::create('{table}', function (Blueprint $table) {{"
+SCHEMA_TABLE_TEMPLATE = "Schema::table('{table}', function (Blueprint $table) {{"
+
+TYPE_MAP = {
+    'integer': 'integer',
+    'string': 'string',
+    'text': 'text',
+    'boolean': 'boolean',
+    'datetime': 'dateTime',
+    'date': 'date',
+    'float': 'float',
+    'double': 'double',
+    'bigint': 'bigInteger',
+    'smallint': 'smallInteger',
+    'tinyint': 'tinyInteger',
+    'char': 'char',
+    'decimal': 'decimal'
+}
+
+class MigrationContext:
+    __slots__ = ("up", "down", "actions")
+
+    def __init__(self):
+        self.up = []
+        self.down = []
+        self.actions = []
 
 def parse_column_list(s):
+    if ',' not in s:
+        return f"['{s.strip()}']"
     columns = s.split(",")
     return '[' + ', '.join(f"'{c.strip()}'" for c in columns) + ']'
 
+def bool_attr(element, name):
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
+
 def parse_column_element(column_element):
     name = column_element.get('Name')
     data_type = column_element.get('Type')
-    nullable = column_element.get('Nullable', 'false').lower() == 'true'
+    nullable = bool_attr(column_element, 'Nullable')
     default = column_element.get('Default', '')
     comment = column_element.get('Comment', '')
-    auto_increment = column_element.get('AutoIncrement', 'false').lower() == 'true'
+    auto_increment = bool_attr(column_element, 'AutoIncrement')
 
-    method = f"$table->{laravel_type(data_type)}('{name}')"
+    parts = [f"$table->{laravel_type(data_type)}('{name}')"]
     if auto_increment:
-        method += '->increments()'
+        parts.append('->increments()')
     if nullable:
-        method += '->nullable(true)'
+        parts.append('->nullable(true)')
     if default:
         if default.lower() == 'null':
-            method += "->default(null)"
+            parts.append("->default(null)")
         else:
-            method += f"->default('{default}')"
+            parts.append(f"->default('{default}')")
     if comment:
-        method += f"->comment('{comment}')"
+        parts.append(f"->comment('{comment}')")
 
-    return method
+    return "".join(parts)
 
 def laravel_type(db_type):
-    mapping = {
-        'integer': 'integer',
-        'string': 'string',
-        'text': 'text',
-        'boolean': 'boolean',
-        'datetime': 'dateTime',
-        'date': 'date',
-        'float': 'float',
-        'double': 'double',
-        'bigint': 'bigInteger',
-        'smallint': 'smallInteger',
-        'tinyint': 'tinyInteger',
-        'char': 'char',
-        'decimal': 'decimal'
-    }
-    return mapping.get(db_type.lower(), db_type)
-
-def handle_create_table(diff):
+    return TYPE_MAP.get(db_type) or TYPE_MAP.get(db_type.lower(), db_type)
+
+def handle_create_table(ctx, diff):
     table = diff.attrib['Name']
-    actions.append(f"create_{table}_table")
+    ctx.actions.append(f"create_{table}_table")
 
-    up.append(f"Schema::create('{table}', function (Blueprint $table) {{")
+    ctx.up.append(SCHEMA_CREATE_TEMPLATE.format(table=table))
     for column in diff.findall('Column'):
-        up.append(INDENT + parse_column_element(column) + ';')
+        ctx.up.append(INDENT + parse_column_element(column) + ';')
 
     for pk in diff.findall('PrimaryKey'):
         cols = parse_column_list(pk.get('Columns'))
-        up.append(INDENT + f"$table->primary({cols}, '{pk.get('Name', 'pk_' + table)}');")
+        ctx.up.append(INDENT + f"$table->primary({cols}, '{pk.get('Name', 'pk_' + table)}');")
 
     for idx in diff.findall('Index'):
-        up.append(INDENT + f"$table->index({parse_column_list(idx.get('Columns'))}, '{idx.get('Name')}');")
+        ctx.up.append(INDENT + f"$table->index({parse_column_list(idx.get('Columns'))}, '{idx.get('Name')}');")
 
     for uq in diff.findall('Unique'):
-        up.append(INDENT + f"$table->unique({parse_column_list(uq.get('Columns'))}, '{uq.get('Name')}');")
+        ctx.up.append(INDENT + f"$table->unique({parse_column_list(uq.get('Columns'))}, '{uq.get('Name')}');")
 
     for fk in diff.findall('ForeignKey'):
-        up.append(INDENT + handle_foreign_key_inline(fk))
+        ctx.up.append(INDENT + handle_foreign_key_inline(fk))
 
-    up.append("});")
+    ctx.up.append("});")
 
-    down.append(f"Schema::dropIfExists('{table}');")
+    ctx.down.append(f"Schema::dropIfExists('{table}');")
 
-def handle_drop_table(diff):
+def handle_drop_table(ctx, diff):
     table = diff.attrib['Name']
-    actions.append(f"drop_table_{table}")
-    up.append(f"Schema::dropIfExists('{table}');")
-    down.append(f"echo \"Cannot safely revert this migration: table '{table}' was dropped and data is lost.\";")
-    down.append("return false;")
+    ctx.actions.append(f"drop_table_{table}")
+    ctx.up.append(f"Schema::dropIfExists('{table}');")
+    ctx.down.append(f"echo \"Cannot safely revert this migration: table '{table}' was dropped and data is lost.\";")
+    ctx.down.append("return false;")
 
-def handle_alter_table(diff):
+def handle_alter_table(ctx, diff):
     table = diff.find('Name').text
-    actions.append(f"alter_{table}_table")
+    ctx.actions.append(f"alter_{table}_table")
     unable_to_revert = False
 
     rename_to = diff.attrib.get('RenameTo')
     if rename_to:
-        up.append(f"Schema::rename('{table}', '{rename_to}');")
-        down.append(f"Schema::rename('{rename_to}', '{table}');")
+        ctx.up.append(f"Schema::rename('{table}', '{rename_to}');")
+        ctx.down.append(f"Schema::rename('{rename_to}', '{table}');")
         table = rename_to
 
+    dropped_columns = []
+    added_columns = []
+    renamed_columns = []
+    down_dropped_columns = []
+    down_renamed_columns = []
+
     for col in diff.findall('DropColumn'):
         name = col.get('Name')
-        up.append(f"Schema::table('{table}', function (Blueprint $table) {{ $table->dropColumn('{name}'); }});")
-        down.append(f"echo \"Cannot safely revert this migration: column '{name}' was dropped.\";")
+        dropped_columns.append(f"$table->dropColumn('{name}');")
+        ctx.down.append(f"echo \"Cannot safely revert this migration: column '{name}' was dropped.\";")
         unable_to_revert = True
 
     for col in diff.findall('AddColumn'):
-        up.append(f"Schema::table('{table}', function (Blueprint $table) {{ {parse_column_element(col)}; }});")
-        down.append(f"Schema::table('{table}', function (Blueprint $table) {{ $table->dropColumn('{col.get('Name')}'); }});")
+        added_columns.append(parse_column_element(col) + ';')
+        down_dropped_columns.append(f"$table->dropColumn('{col.get('Name')}');")
 
     for ch in diff.findall('ChangeColumn'):
         new_col = ch.find('NewColumn')
         old_col = ch.find('OldColumn')
-        up.append(f"Schema::table('{table}', function (Blueprint $table) {{ $table->renameColumn('{old_col.get('Name')}', '{new_col.get('Name')}'); }});")
-        down.append(f"Schema::table('{table}', function (Blueprint $table) {{ $table->renameColumn('{new_col.get('Name')}', '{old_col.get('Name')}'); }});")
+        renamed_columns.append(f"$table->renameColumn('{old_col.get('Name')}', '{new_col.get('Name')}');")
+        down_renamed_columns.append(f"$table->renameColumn('{new_col.get('Name')}', '{old_col.get('Name')}');")
+
+    # Laravel runs a blueprint's column additions before its other commands,
+    # so additions get their own closure to keep drops and renames in order
+    schema_table = SCHEMA_TABLE_TEMPLATE.format(table=table)
+    for lines, columns in (
+            (ctx.up, dropped_columns),
+            (ctx.up, added_columns),
+            (ctx.up, renamed_columns),
+            (ctx.down, down_dropped_columns),
+            (ctx.down, down_renamed_columns)):
+        if columns:
+            lines.append(schema_table)
+            lines.extend(INDENT + column for column in columns)
+            lines.append("});")
 
     if unable_to_revert:
-        down.append("return false;")
+        ctx.down.append("return false;")
 
 def handle_foreign_key_inline(fk):
     name = fk.get('Name')
@@ -136,54 +171,61 @@ def handle_foreign_key_inline(fk):
 
     return fk_stmt
 
-def get_filename():
-    now = datetime.now()
-    suffix = actions[0] if len(actions) == 1 else 'migration'
-    return now.strftime(f"%Y_%m_%d_%H%M%S_{suffix}.php")
-
-def generate_class():
-    lines = [
-        "<?php",
-        "use Illuminate\\Database\\Migrations\\Migration;",
-        "use Illuminate\\Database\\Schema\\Blueprint;",
-        "use Illuminate\\Support\\Facades\\Schema;",
-        "",
-        f"return new class extends Migration {{",
-        INDENT + "public function up(): void",
-        INDENT + "{"
-    ]
-    for line in up:
-        lines.append(INDENT * 2 + line)
-    lines.append(INDENT + "}")
-    lines.append("")
-    lines.append(INDENT + "public function down(): void")
-    lines.append(INDENT + "{")
-    for line in down:
-        lines.append(INDENT * 2 + line)
-    lines.append(INDENT + "}")
-    lines.append("};")
-    return NEWLINE.join(lines)
+def get_filename(ctx):
+    suffix = ctx.actions[0] if len(ctx.actions) == 1 else 'migration'
+    return time.strftime("%Y_%m_%d_%H%M%S_") + suffix + ".php"
+
+def generate_class(ctx):
+    line_prefix = NEWLINE + INDENT2
+    body_up = "".join(line_prefix + line for line in ctx.up)
+    body_down = "".join(line_prefix + line for line in ctx.down)
+    return (
+        "<?php\n"
+        "use Illuminate\\Database\\Migrations\\Migration;\n"
+        "use Illuminate\\Database\\Schema\\Blueprint;\n"
+        "use Illuminate\\Support\\Facades\\Schema;\n"
+        "\n"
+        "return new class extends Migration {\n"
+        f"{INDENT}public function up(): void\n"
+        f"{INDENT}{{{body_up}\n"
+        f"{INDENT}}}\n"
+        "\n"
+        f"{INDENT}public function down(): void\n"
+        f"{INDENT}{{{body_down}\n"
+        f"{INDENT}}}\n"
+        "};"
+    )
+
+def iter_diffs(source):
+    depth = 0
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            yield element
+            element.clear()
+
+HANDLERS = {
+    'CreateTable': handle_create_table,
+    'DropTable': handle_drop_table,
+    'AlterTable': handle_alter_table,
+}
 
 def main():
-    xml_data = sys.stdin.read()
-    tree = ET.ElementTree(ET.fromstring(xml_data))
-    root = tree.getroot()
-
-    for diff in root:
-        match diff.tag:
-            case 'CreateTable':
-                handle_create_table(diff)
-            case 'DropTable':
-                handle_drop_table(diff)
-            case 'AlterTable':
-                handle_alter_table(diff)
+    ctx = MigrationContext()
+    for diff in iter_diffs(sys.stdin.buffer):
+        handler = HANDLERS.get(diff.tag)
+        if handler:
+            handler(ctx, diff)
 
     os.makedirs("Laravel-Migrations", exist_ok=True)
-    filename = get_filename()
-    class_code = generate_class()
+    filename = get_filename(ctx)
+    class_code = generate_class(ctx)
 
-    with open(os.path.join("Laravel-Migrations", filename), "w", encoding="utf-8", newline='') as f:
-        f.write(class_code)
+    with open(os.path.join("Laravel-Migrations", filename), "wb") as f:
+        f.write(class_code.encode("utf-8"))
     
     print(f"Migration written to Laravel-Migrations/{filename}")
 
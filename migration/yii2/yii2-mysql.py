@@ -2,142 +2,155 @@
 
 import os
 import sys
+import time
 import xml.etree.ElementTree as ET
-from datetime import datetime
 
 INDENT = "    "
+INDENT2 = INDENT * 2
 NEWLINE = "\n"
-    
-up = []
-down = []
-actions = []
+
+class MigrationContext:
+    __slots__ = ("up", "down", "actions")
+
+    def __init__(self):
+        self.up = []
+        self.down = []
+        self.actions = []
 
 def parse_column_list(s):
-    columns = s.split(",")
-    if len(columns) < 2:
+    if "," not in s:
         return "'" + s + "'"
+    columns = s.split(",")
     return "[" + ", ".join(f"'{c.strip()}'" for c in columns) + "]"
 
+def bool_attr(element, name):
+    value = element.get(name)
+    return value is not None and value[:1] in ("t", "T")
+
 def parse_column_element(column_element):
     name = column_element.get('Name')
     data_type = column_element.get('Type')
-    nullable = column_element.get('Nullable', 'false').lower() == 'true'
-    auto_increment = column_element.get('AutoIncrement', 'false').lower() == 'true'
+    nullable = bool_attr(column_element, 'Nullable')
+    auto_increment = bool_attr(column_element, 'AutoIncrement')
     default = column_element.get('Default', '')
     comment = column_element.get('Comment', '')
     
-    column_definition = f"$table->{data_type}('{name}')"
+    parts = [f"$table->{data_type}('{name}')"]
     
     if not nullable:
-        column_definition += "->notNull()"
+        parts.append("->notNull()")
     
     if auto_increment:
-        column_definition += "->autoIncrement()"
+        parts.append("->autoIncrement()")
     
     if default:
-        column_definition += f"->default('{default}')"
+        parts.append(f"->default('{default}')")
     
     if comment:
-        column_definition += f"->comment('{comment}')"
+        parts.append(f"->comment('{comment}')")
     
-    return column_definition
+    return "".join(parts)
     
         
-def handle_alter_table(diff):
+def handle_alter_table(ctx, diff):
     table_name = diff.find('Name').text
     table_name_down = table_name
-    actions.append("alter_" + table_name + "_table")
+    ctx.actions.append("alter_" + table_name + "_table")
     unable_to_revert = False
 
+    children = {}
+    for child in diff:
+        children.setdefault(child.tag, []).append(child)
+
     rename_to = diff.attrib.get('RenameTo')
     if rename_to:
-        up.append(f"$this->renameTable('{table_name}', '{rename_to}');")
-        down.append(f"$this->renameTable('{rename_to}', '{table_name}');")
+        ctx.up.append(f"$this->renameTable('{table_name}', '{rename_to}');")
+        ctx.down.append(f"$this->renameTable('{rename_to}', '{table_name}');")
         table_name = rename_to
 
     # Drop primary key
-    for pk in diff.findall('DropPrimaryKey'):
+    for pk in children.get('DropPrimaryKey', ()):
         name = pk.get('Name', f"pk_{table_name}")
-        up.append(f"$this->dropPrimaryKey('{name}', '{table_name}');")
+        ctx.up.append(f"$this->dropPrimaryKey('{name}', '{table_name}');")
         
     # Drop index
-    for idx in diff.findall('DropIndex'):
+    for idx in children.get('DropIndex', ()):
         name = idx.get('Name')
-        up.append(f"$this->dropIndex('{name}', '{table_name}');")
+        ctx.up.append(f"$this->dropIndex('{name}', '{table_name}');")
         
     # Drop unique
-    for uq in diff.findall('DropUnique'):
+    for uq in children.get('DropUnique', ()):
         name = uq.get('Name')
-        up.append(f"$this->dropIndex('{name}', '{table_name}');")
+        ctx.up.append(f"$this->dropIndex('{name}', '{table_name}');")
 
     # Drop foreign key
-    for fk in diff.findall('DropForeignKey'):
+    for fk in children.get('DropForeignKey', ()):
         name = fk.get('Name')
-        up.append(f"$this->dropForeignKey('{name}', '{table_name}');")
+        ctx.up.append(f"$this->dropForeignKey('{name}', '{table_name}');")
 
     # Drop columns
-    for column in diff.findall('DropColumn'):
+    for column in children.get('DropColumn', ()):
         column_name = column.get('Name')
-        up.append(f"$this->dropColumn('{table_name}', '{column_name}');")
-        down.append(f"echo \"Cannot safely revert this migration: column '{column_name}' was dropped from table '{table_name}'.\";")
+        ctx.up.append(f"$this->dropColumn('{table_name}', '{column_name}');")
+        ctx.down.append(f"echo \"Cannot safely revert this migration: column '{column_name}' was dropped from table '{table_name}'.\";")
         unable_to_revert = True
 
     # Change columns
-    for change_column in diff.findall('ChangeColumn'):
+    for change_column in children.get('ChangeColumn', ()):
         new_column = change_column.find('NewColumn')
         old_column = change_column.find('OldColumn')
         old_column_name = old_column.get('Name')
         new_column_name = new_column.get('Name')
-        up.append(f"$this->alterColumn('{table_name}', '{old_column_name}', {parse_column_element(new_column)});")
-        down.append(f"$this->alterColumn('{table_name_down}', '{new_column_name}', {parse_column_element(old_column)});")
+        ctx.up.append(f"$this->alterColumn('{table_name}', '{old_column_name}', {parse_column_element(new_column)});")
+        ctx.down.append(f"$this->alterColumn('{table_name_down}', '{new_column_name}', {parse_column_element(old_column)});")
 
     # Add columns
-    for column in diff.findall('AddColumn'):
+    for column in children.get('AddColumn', ()):
         column_name = column.get('Name')
-        up.append(f"$this->addColumn('{table_name}', '{column_name}', {parse_column_element(column)});")
-        down.append(f"$this->dropColumn('{table_name_down}', '{column_name}');")
+        ctx.up.append(f"$this->addColumn('{table_name}', '{column_name}', {parse_column_element(column)});")
+        ctx.down.append(f"$this->dropColumn('{table_name_down}', '{column_name}');")
         
     # Add primary key
-    for pk in diff.findall('AddPrimaryKey'):
+    for pk in children.get('AddPrimaryKey', ()):
         name = pk.get('Name', f"pk_{table_name}")
         columns = pk.get('Columns')
-        up.append(f"$this->addPrimaryKey('{name}', '{table_name}', {parse_column_list(columns)});")
-        down.append(f"$this->dropPrimaryKey('{name}', '{table_name_down}');")
+        ctx.up.append(f"$this->addPrimaryKey('{name}', '{table_name}', {parse_column_list(columns)});")
+        ctx.down.append(f"$this->dropPrimaryKey('{name}', '{table_name_down}');")
 
     # Add index
-    for idx in diff.findall('AddIndex'):
+    for idx in children.get('AddIndex', ()):
         name = idx.get('Name')
         columns = idx.get('Columns')
-        up.append(f"$this->createIndex('{name}', '{table_name}', {parse_column_list(columns)});")
-        down.append(f"$this->dropIndex('{name}', '{table_name_down}');")
+        ctx.up.append(f"$this->createIndex('{name}', '{table_name}', {parse_column_list(columns)});")
+        ctx.down.append(f"$this->dropIndex('{name}', '{table_name_down}');")
         
     # Add unique
-    for uq in diff.findall('AddUnique'):
+    for uq in children.get('AddUnique', ()):
         name = uq.get('Name')
         columns = uq.get('Columns')
-        up.append(f"$this->createIndex('{name}', '{table_name}', {parse_column_list(columns)}, true);")
-        down.append(f"$this->dropIndex('{name}', '{table_name_down}');")
+        ctx.up.append(f"$this->createIndex('{name}', '{table_name}', {parse_column_list(columns)}, true);")
+        ctx.down.append(f"$this->dropIndex('{name}', '{table_name_down}');")
     
     # Add foreign key
-    for fk in diff.findall('AddForeignKey'):
-        handle_foreign_key(table_name, fk)
+    for fk in children.get('AddForeignKey', ()):
+        handle_foreign_key(ctx, table_name, fk)
         
     # Change table comment
     if 'Comment' in diff.attrib:
         new_comment = diff.attrib['Comment']
-        up.append(f"$this->addCommentOnTable('{table_name}', '{new_comment}');")
+        ctx.up.append(f"$this->addCommentOnTable('{table_name}', '{new_comment}');")
         
     if unable_to_revert:
-        down.append("return false;")
+        ctx.down.append("return false;")
 
-def handle_drop_table(diff):
+def handle_drop_table(ctx, diff):
     table = diff.attrib["Name"]
-    up.append(f"$this->dropTable(\"{table}\");")
-    actions.append("drop_table_" + table)
-    down.append(f"echo \"Cannot safely revert this migration: table '{table}' was dropped and data is lost.\";")
-    down.append("return false;")
+    ctx.up.append(f"$this->dropTable(\"{table}\");")
+    ctx.actions.append("drop_table_" + table)
+    ctx.down.append(f"echo \"Cannot safely revert this migration: table '{table}' was dropped and data is lost.\";")
+    ctx.down.append("return false;")
 
-def handle_foreign_key(table_name, foreign_key):
+def handle_foreign_key(ctx, table_name, foreign_key):
     name = foreign_key.get('Name')
     from_columns = foreign_key.get('FromColumn')
     to_columns = foreign_key.get('ToColumn')
@@ -150,19 +163,19 @@ def handle_foreign_key(table_name, foreign_key):
         lines.append(f"'{on_delete}'")
         lines.append(f"'{on_update}'")
 
-    up.append(f"$this->addForeignKey('{name}',")
+    ctx.up.append(f"$this->addForeignKey('{name}',")
     for line in lines[:-1]:
-        up.append(INDENT + line + ",")
-    up.append(INDENT + lines[-1] + ");")
+        ctx.up.append(INDENT + line + ",")
+    ctx.up.append(INDENT + lines[-1] + ");")
 
-    down.append(f"$this->dropForeignKey('{name}', '{table_name}');")
+    ctx.down.append(f"$this->dropForeignKey('{name}', '{table_name}');")
 
-def handle_create_table(diff):
+def handle_create_table(ctx, diff):
     table = diff.attrib["Name"]
     comment = diff.attrib.get("Comment")
     
-    actions.append("create_" + table + "_table")
-    up.append(f"$this->createTable(\"{table}\", [")
+    ctx.actions.append("create_" + table + "_table")
+    ctx.up.append(f"$this->createTable(\"{table}\", [")
     
     column_lines = []
     for column in diff.findall('Column'):
@@ -170,87 +183,98 @@ def handle_create_table(diff):
     
     # must be at least one column
     for line in column_lines[:-1]:
-        up.append(line + ",")
-    up.append(column_lines[-1])
-    up.append("]);")
+        ctx.up.append(line + ",")
+    ctx.up.append(column_lines[-1])
+    ctx.up.append("]);")
     
     # Handling primary key
     for primary_key in diff.findall('PrimaryKey'):
         columns = primary_key.get('Columns')
         name = primary_key.get('Name', f"pk_{table}")
-        up.append(f"$this->addPrimaryKey('{name}', '{table}', {parse_column_list(columns)});")
+        ctx.up.append(f"$this->addPrimaryKey('{name}', '{table}', {parse_column_list(columns)});")
     
     # Handling indexes
     for index in diff.findall('Index'):
         columns = index.get('Columns')
         name = index.get('Name')
-        up.append(f"$this->createIndex('{name}', '{table}', {parse_column_list(columns)});")
+        ctx.up.append(f"$this->createIndex('{name}', '{table}', {parse_column_list(columns)});")
     
     # Handling uniques
     for unique in diff.findall('Unique'):
         columns = unique.get('Columns')
         name = unique.get('Name')
-        up.append(f"$this->createIndex('{name}', '{table}', {parse_column_list(columns)}, true);")
+        ctx.up.append(f"$this->createIndex('{name}', '{table}', {parse_column_list(columns)}, true);")
     
     for foreign_key in diff.findall('ForeignKey'):
-        handle_foreign_key(table, foreign_key)
+        handle_foreign_key(ctx, table, foreign_key)
         
-    down.append(f"$this->dropTable(\"{table}\");")
+    ctx.down.append(f"$this->dropTable(\"{table}\");")
 
-def get_class_name():
-    name = actions[0]
-    if len(actions) > 1:
+def get_class_name(ctx):
+    name = ctx.actions[0]
+    if len(ctx.actions) > 1:
         name = "migrations"
         
-    formatted_datetime = datetime.now().strftime("%y%m%d_%H%M%S")
+    formatted_datetime = time.strftime("%y%m%d_%H%M%S")
     return "m" + formatted_datetime + "_" + name
 
-def get_class():
-    class_lines = []
-    class_lines.append("class " + get_class_name() + " extends Migration")
-    class_lines.append("{")
-    class_lines.append(INDENT + "public function safeUp()")
-    class_lines.append(INDENT + "{")
-    for line_up in up:
-        class_lines.append(INDENT*2 + line_up)
-    class_lines.append(INDENT + "}")
-    class_lines.append("")
-    class_lines.append(INDENT + "public function safeDown()")
-    class_lines.append(INDENT + "{")
-    for line_down in down:
-        class_lines.append(INDENT*2 + line_down)
-    class_lines.append(INDENT + "}")
-    class_lines.append("}")
-    return NEWLINE.join(class_lines)
+def get_class(ctx):
+    line_prefix = NEWLINE + INDENT2
+    body_up = "".join(line_prefix + line for line in ctx.up)
+    body_down = "".join(line_prefix + line for line in ctx.down)
+    return (
+        f"class {get_class_name(ctx)} extends Migration\n"
+        "{\n"
+        f"{INDENT}public function safeUp()\n"
+        f"{INDENT}{{{body_up}\n"
+        f"{INDENT}}}\n"
+        "\n"
+        f"{INDENT}public function safeDown()\n"
+        f"{INDENT}{{{body_down}\n"
+        f"{INDENT}}}\n"
+        "}"
+    )
+
+def iter_diffs(source):
+    depth = 0
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            yield element
+            element.clear()
+
+HANDLERS = {
+    "CreateTable": handle_create_table,
+    "DropTable": handle_drop_table,
+    "AlterTable": handle_alter_table,
+}
 
 def main():
-    xml_data = sys.stdin.read()
+    source = sys.stdin.buffer
     
     #uncomment for debug purposes
-    #with open("migration_model.xml", "w", encoding="utf-8") as f:
-    #    f.write(xml_data)
+    #with open("migration_model.xml", "wb") as f:
+    #    f.write(source.read())
+    #source = "migration_model.xml"
     
-    tree = ET.ElementTree(ET.fromstring(xml_data))
-    root = tree.getroot()
+    ctx = MigrationContext()
+    for diff in iter_diffs(source):
+        handler = HANDLERS.get(diff.tag)
+        if handler:
+            handler(ctx, diff)
     
-    for diff in root:
-        match diff.tag:
-            case "CreateTable":
-                handle_create_table(diff)
-            case "DropTable":
-                handle_drop_table(diff)
-            case "AlterTable":
-                handle_alter_table(diff)
-    
-    filename = get_class_name() + ".php"
-    class_text = get_class()
-    
-    print(class_text)
+    filename = get_class_name(ctx) + ".php"
+    class_text = get_class(ctx)
     
     directory = "Yii2-Migrations"
     os.makedirs(directory, exist_ok=True)
-    with open(os.path.join(directory, filename), "w", encoding="utf-8", newline='') as f:
-        f.write(class_text)
+    with open(os.path.join(directory, filename), "wb") as f:
+        f.write(class_text.encode("utf-8"))
+    
+    print(f"Migration written to {directory}/{filename}")
 
 if __name__ == "__main__":
     main()